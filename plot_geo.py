@@ -1,7 +1,5 @@
-import pandas as pd
+import os
 import numpy as np
-import geopandas as gpd
-import matplotlib.pyplot as plt
 
 def plot_partition_geographically(data: np.ndarray, partition: list, shapefile_path: str):
     """
@@ -19,80 +17,100 @@ def plot_partition_geographically(data: np.ndarray, partition: list, shapefile_p
         shapefile_path: The file path to the .shp file for
                         North Carolina census tracts.
     """
-    
+
+    # geopandas pulls in fiona/pyproj/shapely (1-2s of import time), so
+    # the heavy plotting deps are only imported once this is called
+    import geopandas as gpd
+    import matplotlib.pyplot as plt
+    import shapely
+
     print("Loading shapefile...")
-    # 1. Load the North Carolina census tract shapefile
+    # 1. Load the North Carolina census tract shapefile. The first run
+    # reprojects to EPSG:5070 (USA Contiguous Albers, in meters) and
+    # caches the GeoDataFrame as Feather; later runs load the columnar
+    # Arrow file directly instead of re-parsing the shapefile through OGR
+    cache_path = shapefile_path + '.feather'
     try:
-        gdf_nc = gpd.read_file(shapefile_path)
+        if os.path.exists(cache_path):
+            gdf_nc = gpd.read_feather(cache_path)
+        else:
+            gdf_nc = gpd.read_file(shapefile_path).to_crs('EPSG:5070')
+            gdf_nc.to_feather(cache_path)
     except Exception as e:
         print(f"Error loading shapefile: {e}")
         print("Please ensure you have 'geopandas' installed (`pip install geopandas`)")
         print(f"And that the path '{shapefile_path}' is correct.")
         return
 
-    # 2. Create a DataFrame from your partition data
+    # 2. Map each data row to its cluster ID
     # We need to link GEOID (from data[i, 0]) to a cluster ID
-    
-    # First, link original_index to cluster_id
-    partition_data = []
+    # cluster_of[i] is the cluster of row i (-1 for rows not in the partition)
+    cluster_of = np.full(data.shape[0], -1, dtype=np.int32)
     for cluster_id, indices in enumerate(partition):
-        for index in indices:
-            partition_data.append({
-                'original_index': index,
-                'cluster': cluster_id
-            })
-    df_partition = pd.DataFrame(partition_data)
-
-    # Next, link original_index to GEOID
-    df_geoids = pd.DataFrame({
-        'GEOID': data[:, 0], # Assumes GEOID is in column 0
-        'original_index': np.arange(data.shape[0])
-    })
-
-    # Now, merge them so we have GEOID <-> cluster
-    df_clusters = df_geoids.merge(df_partition, on='original_index')
-    
+        cluster_of[np.asarray(indices, dtype=np.intp)] = cluster_id
+
     # 3. Standardize GEOID formats for merging
     # This is a critical step.
     # User's format: "1500000US370010201001" (string)
     # Shapefile format: "37001020100" (string)
     # We must extract the 11-digit tract ID from the user's string.
-    
+
     # --- THIS IS THE FIX ---
+    # One vectorized pass over a fixed-width NumPy string array instead of
+    # three pandas .str scans that each allocate an intermediate object Series
     try:
-        # Ensure it's a string, split at 'US', take the 2nd part, and keep 1st 11 chars
-        df_clusters['GEOID'] = df_clusters['GEOID'].astype(str).str.split('US').str[1].str[:11]
+        geoid_arr = data[:, 0].astype('U')
+        us_pos = np.char.find(geoid_arr, 'US')
     except Exception as e:
         print(f"Error processing your GEOIDs: {e}")
         print("The code expects the GEOID in data[:, 0] to be in a format like '...US370010201001'")
-        print(f"First 5 GEOIDs in your data: {df_geoids['GEOID'].head().values}")
+        print(f"First 5 GEOIDs in your data: {data[:5, 0]}")
         return
-    
-    # Check if the split worked (it will be None if 'US' wasn't found)
-    if df_clusters['GEOID'].isnull().any():
+
+    # Check that 'US' was found in every GEOID
+    if (us_pos < 0).any():
         print("Error: Some GEOIDs were not in the expected '...US...' format.")
         print("Could not extract 11-digit tract ID.")
-        print(f"First 5 GEOIDs in your data: {df_geoids['GEOID'].head().values}")
-        print(f"First 5 *processed* GEOIDs: {df_clusters['GEOID'].head().values}")
+        print(f"First 5 GEOIDs in your data: {data[:5, 0]}")
         return
+
+    # Take the 11 chars after 'US' (the tract ID)
+    start = int(us_pos[0]) + 2
+    if (us_pos == us_pos[0]).all() and geoid_arr.itemsize >= 4 * (start + 11):
+        # Common case: a fixed-length prefix like '1500000US', so the tract
+        # ID can be sliced straight out of the contiguous unicode buffer
+        chars = geoid_arr.view('U1').reshape(len(geoid_arr), -1)
+        processed_geoids = np.ascontiguousarray(chars[:, start:start + 11]).view('U11').ravel()
+    else:
+        processed_geoids = np.array(
+            [s[p + 2:p + 13] for s, p in zip(geoid_arr, us_pos)], dtype='U11')
     # --- END OF FIX ---
 
     # Ensure GEOID in shapefile is also a string
     # (The TIGER file GEOID column is named 'GEOID')
     gdf_nc['GEOID'] = gdf_nc['GEOID'].astype(str)
 
-    # 4. Merge your cluster data with the GeoDataFrame
+    # 4. Attach the cluster ids to the GeoDataFrame with one dict lookup
+    # per tract instead of merging intermediate DataFrames
     print("Merging partition data with map...")
-    merged_gdf = gdf_nc.merge(df_clusters, on='GEOID', how='left')
-    
+    geoid_to_cluster = {geoid: cluster for geoid, cluster
+                        in zip(processed_geoids, cluster_of) if cluster >= 0}
+    gdf_nc['cluster'] = gdf_nc['GEOID'].map(geoid_to_cluster)
+
     # 'cluster' column will be NaN for tracts not in your data
-    
+
     # 5. Plot the final map
     print("Generating plot...")
     fig, ax = plt.subplots(1, 1, figsize=(20, 12))
-    
+
+    # Simplify the fill geometries before plotting: matplotlib's path
+    # rendering scales with vertex count, and 100 m of tolerance (the CRS
+    # is in meters) is below a pixel at this figure size. The cluster
+    # borders drawn further down keep the full-resolution geometry.
+    plot_gdf = gdf_nc.set_geometry(gdf_nc.geometry.simplify(100))
+
     # [This is the original plot call, now with linewidth=0]
-    merged_gdf.plot(
+    plot_gdf.plot(
         column='cluster',
         ax=ax,
         legend=True,
@@ -101,6 +119,10 @@ def plot_partition_geographically(data: np.ndarray, partition: list, shapefile_p
         # Remove all individual tract borders by setting linewidth to 0
         linewidth=0,
         # --- END OF FIX ---
+        # Render the tract fills as one rasterized image instead of
+        # thousands of antialiased vector paths
+        rasterized=True,
+        antialiased=False,
         missing_kwds={
             "color": "lightgrey",
             "edgecolor": "#ffffff",
@@ -110,11 +132,14 @@ def plot_partition_geographically(data: np.ndarray, partition: list, shapefile_p
     )
     
     # --- NEW: Draw cluster-separating borders ---
-    # Dissolve all tracts by their cluster ID into giant "super-polygons"
-    dissolved_gdf = merged_gdf.dissolve(by='cluster')
-    
+    # Union each cluster's tracts into a "super-polygon" directly with
+    # shapely's vectorized union_all; we only need the geometry, so this
+    # skips the full groupby-agg that gdf.dissolve(by='cluster') would run
+    cluster_geoms = gdf_nc.groupby('cluster')['geometry'].apply(
+        lambda geoms: shapely.union_all(geoms.values))
+
     # Plot *only the boundaries* of these new super-polygons
-    dissolved_gdf.boundary.plot(
+    gpd.GeoSeries(cluster_geoms, crs=gdf_nc.crs).boundary.plot(
         ax=ax,
         color="black",
         linewidth=0.5 # A thin black line
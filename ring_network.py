@@ -1,146 +1,302 @@
 import numpy as np
 import networkx as nx
+import scipy.sparse as sp
+from functools import cache
+
+try:
+    import numba
+except ImportError:
+    # numba is optional; create_network and prune_markers_minimal fall
+    # back to pure NumPy/Python
+    numba = None
+
+if numba is not None:
+    @cache
+    def _get_bins_kernel(data_dtype):
+        """
+        Compile the binning kernel for a data dtype and memoize the
+        specialization, so repeated runs on same-dtype data skip both
+        recompilation and dispatch.
+        """
+        value_t = numba.from_dtype(np.dtype(data_dtype))
+
+        @numba.njit([(value_t[:, ::1], value_t)], parallel=True, cache=True)
+        def compute_bins(data, window_size):
+            # Per-dimension min/max and the bin index of every point. The
+            # dimensions are independent, so prange spreads them over cores.
+            num_data, num_dims = data.shape
+            bins = np.empty((num_data, num_dims), np.int64)
+            mins = np.empty(num_dims, data.dtype)
+            maxs = np.empty(num_dims, data.dtype)
+            for dim in numba.prange(num_dims):
+                min_value = data[0, dim]
+                max_value = data[0, dim]
+                for i in range(num_data):
+                    value = data[i, dim]
+                    if value < min_value:
+                        min_value = value
+                    if value > max_value:
+                        max_value = value
+                mins[dim] = min_value
+                maxs[dim] = max_value
+                for i in range(num_data):
+                    bins[i, dim] = int((data[i, dim] - min_value) / window_size)
+            return bins, mins, maxs
+
+        return compute_bins
 def create_network(data:np.ndarray, weights,window_size):
-    # First add each data point as a node
-    G = nx.Graph()
-    for i in range(data.shape[0]):
-        G.add_node(i)
-
-    # For each dimension in the data, add edges between points within a certain window size
-    
-    for dim in range(data.shape[1]):
-        weight=weights[dim]
-        # Find the max of the current dimension
-        dim_values = data[:, dim]
-        max_value = np.max(dim_values)
-        min_value = np.min(dim_values)
-        
-        n=int((max_value-min_value)/window_size) + 1
-        
-        # this add each marker in the dimesion as a node, so that data points close to it can connect to it
-        markers = [window_size * i + min_value for i in range(n+1)]
-        G.add_node(f'{dim},{markers[0]:.4f}', marker=True, dim=dim, value=markers[0])
-        for i in range(1,n+1):
-            G.add_node(f'{dim},{markers[i]:.4f}', marker=True, dim=dim, value=markers[i])
-            G.add_edge(f'{dim},{markers[i-1]:.4f}',f'{dim},{markers[i]:.4f}', weight=weight)
-        
+    """
+    Build the marker network as a scipy.sparse CSR adjacency matrix.
+
+    Data points keep integer ids 0..N-1; the markers of each dimension get
+    the integer ids after N, contiguous per dimension and in increasing
+    value order. Returns (A, marker_dims, marker_values) where
+    marker_dims[k] and marker_values[k] describe marker node N+k.
+    """
+    num_data = data.shape[0]
+    num_dims = data.shape[1]
+    # float32 is plenty of precision for binning and edge weights, and
+    # halves the memory traffic of the per-dimension scans
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    weights = np.asarray(weights, dtype=np.float32)
+    window_size = np.float32(window_size)
+
+    # Bin every point in every dimension in one pass:
+    # bins[i, dim] is the index of the marker just below data[i, dim]
+    if numba is not None:
+        bins, mins, maxs = _get_bins_kernel(data.dtype)(data, window_size)
+    else:
+        mins = data.min(axis=0)
+        maxs = data.max(axis=0)
+        bins = None
+    n_markers = ((maxs - mins) / window_size).astype(np.int64) + 1
+
+    # Integer id layout: markers of a dimension start at marker_starts[dim]
+    markers_per_dim = n_markers + 1
+    marker_starts = num_data + np.concatenate(([0], np.cumsum(markers_per_dim[:-1])))
+    num_nodes = num_data + markers_per_dim.sum()
+
+    marker_dims = np.repeat(np.arange(num_dims), markers_per_dim)
+    marker_values = np.concatenate(
+        [mins[dim] + window_size * np.arange(markers_per_dim[dim], dtype=np.float32)
+         for dim in range(num_dims)])
+
+    if bins is None:
+        # NumPy fallback: one vectorized binary search per dimension over
+        # the marker grid instead of per-point division; the clip guards
+        # the edges against float rounding
+        bins = np.empty((num_data, num_dims), dtype=np.int64)
+        for dim in range(num_dims):
+            grid_start = marker_starts[dim] - num_data
+            grid = marker_values[grid_start:grid_start + markers_per_dim[dim]]
+            bins[:, dim] = np.clip(
+                np.searchsorted(grid, data[:, dim], side='right') - 1,
+                0, markers_per_dim[dim] - 1)
+
+    # The edge count is known up front: one chain edge between consecutive
+    # markers plus one data->marker edge per point, per dimension
+    total_edges = int((markers_per_dim - 1 + num_data).sum())
+    rows = np.empty(total_edges, dtype=np.int64)
+    cols = np.empty(total_edges, dtype=np.int64)
+    edge_weights = np.empty(total_edges, dtype=np.float32)
+
+    pos = 0
+    for dim in range(num_dims):
+        # chain edges between consecutive markers of the dimension
+        n_chain = int(markers_per_dim[dim]) - 1
+        marker_ids = marker_starts[dim] + np.arange(markers_per_dim[dim])
+        rows[pos:pos + n_chain] = marker_ids[:-1]
+        cols[pos:pos + n_chain] = marker_ids[1:]
+
         # Now connect data points to the nearest marker nodes within the window size
-        for i, point in enumerate(data):
-            point_value = point[dim]
-            lower_marker = markers[int((point_value - min_value) / window_size)]
-            G.add_edge(i, f'{dim},{lower_marker:.4f}', weight=weight)
-        
-    return G
+        rows[pos + n_chain:pos + n_chain + num_data] = np.arange(num_data)
+        cols[pos + n_chain:pos + n_chain + num_data] = marker_starts[dim] + bins[:, dim]
 
-from collections import defaultdict
+        edge_weights[pos:pos + n_chain + num_data] = weights[dim]
+        pos += n_chain + num_data
 
-def show_node_counts(G):
+    A = sp.coo_matrix((edge_weights, (rows, cols)), shape=(num_nodes, num_nodes))
+    A = (A + A.T).tocsr()
+    return A, marker_dims, marker_values
+
+def show_node_counts(A, marker_dims):
     """
     Display node count statistics for the network.
-    
+
+    Node ids below num_data are data points and ids from num_data up are
+    markers, so all counts come straight off the marker_dims array.
+
     Parameters:
     -----------
-    G : nx.Graph
-        NetworkX graph with data point and marker nodes
+    A : scipy.sparse.csr_matrix
+        Adjacency matrix with data point and marker nodes
+    marker_dims : np.ndarray
+        Dimension of each marker node, as returned by create_network
     """
-    
+
     # Count data point nodes
-    num_data = sum(1 for n, d in G.nodes(data=True) if not d.get('marker', False))
-    
-    # Count marker nodes by dimension
-    markers_by_dim = defaultdict(int)
-    for n, d in G.nodes(data=True):
-        if d.get('marker', False):
-            markers_by_dim[d['dim']] += 1
-    
+    num_data = A.shape[0] - len(marker_dims)
+
+    # Count marker nodes by dimension, in one bincount
+    markers_by_dim = {dim: int(count)
+                      for dim, count in enumerate(np.bincount(marker_dims))
+                      if count > 0}
+
     # Total markers
-    num_markers = sum(markers_by_dim.values())
-    
+    num_markers = len(marker_dims)
+
     # Print results
     print("=" * 50)
     print("NODE COUNTS")
     print("=" * 50)
     print(f"Data point nodes: {num_data}")
     print(f"Marker nodes (total): {num_markers}")
-    print(f"Total nodes: {G.number_of_nodes()}")
-    
+    print(f"Total nodes: {A.shape[0]}")
+
     print("\n" + "-" * 50)
     print("Marker nodes per dimension:")
     print("-" * 50)
     for dim in sorted(markers_by_dim.keys()):
         print(f"  Dimension {dim:2d}: {markers_by_dim[dim]:4d} markers")
-    
+
     return {
         'data_nodes': num_data,
         'marker_nodes': num_markers,
         'markers_by_dim': dict(markers_by_dim)
     }
 
-def prune_markers_minimal(G):
+if numba is not None:
+    @cache
+    def _get_rings_kernel(weights_dtype):
+        """
+        Compile the ring-building kernel for a weights dtype and memoize
+        the specialization, like _get_bins_kernel.
+        """
+        weight_t = numba.from_dtype(np.dtype(weights_dtype))
+
+        @numba.njit([(numba.int64[::1], numba.int64[::1], weight_t[::1],
+                      numba.int64[::1])], cache=True)
+        def build_rings(neighbors_flat, offsets, weights_flat, dim_bounds):
+            # Emit the ring and ring-to-ring edges as COO triples.
+            # neighbors_flat/offsets hold each marker's data point
+            # neighbors in CSR layout, weights_flat the matching edge
+            # weights, and dim_bounds the marker index range of each
+            # dimension. Duplicate (row, col) pairs are emitted as-is;
+            # coo_matrix sums them on conversion.
+            num_markers = offsets.size - 1
+            rows = np.empty(neighbors_flat.size + num_markers, np.int64)
+            cols = np.empty(neighbors_flat.size + num_markers, np.int64)
+            ring_weights = np.empty(neighbors_flat.size + num_markers,
+                                    weights_flat.dtype)
+            k = 0
+            for dim in range(dim_bounds.size - 1):
+                for m in range(dim_bounds[dim], dim_bounds[dim + 1]):
+                    start = offsets[m]
+                    count = offsets[m + 1] - start
+                    if count == 0:
+                        continue
+                    weight = weights_flat[start]
+
+                    # 1. Connect neighbors in a ring (cycle)
+                    for i in range(count):
+                        node1 = neighbors_flat[start + i]
+                        node2 = neighbors_flat[start + (i + 1) % count]
+                        if node1 > node2:
+                            node1, node2 = node2, node1
+                        rows[k] = node1
+                        cols[k] = node2
+                        ring_weights[k] = weight
+                        k += 1
+
+                    # 2. Connect to next ring with ONE edge only
+                    if m + 1 < dim_bounds[dim + 1] and offsets[m + 2] > offsets[m + 1]:
+                        node1 = neighbors_flat[start]
+                        node2 = neighbors_flat[offsets[m + 1]]
+                        if node1 > node2:
+                            node1, node2 = node2, node1
+                        rows[k] = node1
+                        cols[k] = node2
+                        ring_weights[k] = weight
+                        k += 1
+            return rows[:k], cols[:k], ring_weights[:k]
+
+        return build_rings
+
+def prune_markers_minimal(A, marker_dims):
     """
     Remove marker nodes and create minimal ring structures.
-    
+
     For each marker:
     1. Connect its data points in a ring (cycle)
     2. Connect this ring to the next ring with ONE edge
     """
-    
-    G_pruned = nx.Graph()
-    
-    # Add all data point nodes
-    data_nodes = [n for n in G.nodes() if isinstance(n, int)]
-    for node in data_nodes:
-        G_pruned.add_node(node)
-    
-    # Organize markers by dimension and sort by value
-    markers_by_dim = defaultdict(list)
-    for n, d in G.nodes(data=True):
-        if d.get('marker', False):
-            markers_by_dim[d['dim']].append((n, d['value']))
-    
-    for dim in markers_by_dim:
-        markers_by_dim[dim].sort(key=lambda x: x[1])
-    
-    # Process each dimension
-    for dim, markers in markers_by_dim.items():
-        
-        for marker_idx, (marker_name, marker_value) in enumerate(markers):
-            
-            neighbors = [n for n in G.neighbors(marker_name) if isinstance(n, int)]
-            
-            if len(neighbors) == 0:
-                continue
-            
-            weight = G[marker_name][neighbors[0]].get('weight', 1.0)
-            
-            # 1. Connect neighbors in a ring (cycle)
-            for i in range(len(neighbors)):
-                node1 = neighbors[i]
-                node2 = neighbors[(i + 1) % len(neighbors)]
-                
-                if G_pruned.has_edge(node1, node2):
-                    G_pruned[node1][node2]['weight'] += weight
-                else:
-                    G_pruned.add_edge(node1, node2, weight=weight)
-            
-            # 2. Connect to next ring with ONE edge only
-            if marker_idx < len(markers) - 1:
-                next_marker_name, _ = markers[marker_idx + 1]
-                next_neighbors = [n for n in G.neighbors(next_marker_name) if isinstance(n, int)]
-                
-                if len(next_neighbors) > 0:
+
+    num_data = A.shape[0] - len(marker_dims)
+
+    # Per-marker data point neighbor lists in CSR layout, computed once
+    # up front for every marker: the marker rows of A restricted to the
+    # data point columns. Markers of one dimension occupy a contiguous
+    # id range, already sorted by value; dim_bounds marks the ranges.
+    B = A[num_data:, :num_data].tocsr()
+    neighbors_flat = B.indices.astype(np.int64)
+    offsets = B.indptr.astype(np.int64)
+    weights_flat = B.data
+    num_dims = int(marker_dims[-1]) + 1
+    dim_bounds = np.searchsorted(marker_dims, np.arange(num_dims + 1)).astype(np.int64)
+
+    if numba is not None:
+        rows, cols, ring_weights = _get_rings_kernel(weights_flat.dtype)(
+            neighbors_flat, offsets, weights_flat, dim_bounds)
+    else:
+        # Pure NumPy fallback over the same precomputed neighbor lists,
+        # emitting the same (row, col, weight) triples
+        ring_rows = []
+        ring_cols = []
+        ring_ws = []
+        link_rows = []
+        link_cols = []
+        link_ws = []
+
+        for dim in range(num_dims):
+            for m in range(dim_bounds[dim], dim_bounds[dim + 1]):
+
+                neighbors = neighbors_flat[offsets[m]:offsets[m + 1]]
+
+                if neighbors.size == 0:
+                    continue
+
+                weight = weights_flat[offsets[m]]
+
+                # 1. Connect neighbors in a ring (cycle)
+                rolled = np.roll(neighbors, -1)
+                ring_rows.append(np.minimum(neighbors, rolled))
+                ring_cols.append(np.maximum(neighbors, rolled))
+                ring_ws.append(np.full(neighbors.size, weight))
+
+                # 2. Connect to next ring with ONE edge only
+                if m + 1 < dim_bounds[dim + 1] and offsets[m + 2] > offsets[m + 1]:
                     # Single edge: first node of current ring to first node of next ring
-                    curr_node = neighbors[0]
-                    next_node = next_neighbors[0]
-                    
-                    if G_pruned.has_edge(curr_node, next_node):
-                        G_pruned[curr_node][next_node]['weight'] += weight
-                    else:
-                        G_pruned.add_edge(curr_node, next_node, weight=weight)
-    
-    return G_pruned
+                    node1 = int(neighbors[0])
+                    node2 = int(neighbors_flat[offsets[m + 1]])
+                    if node1 > node2:
+                        node1, node2 = node2, node1
+                    link_rows.append(node1)
+                    link_cols.append(node2)
+                    link_ws.append(weight)
+
+        rows = np.concatenate(ring_rows + [np.array(link_rows, dtype=np.int64)])
+        cols = np.concatenate(ring_cols + [np.array(link_cols, dtype=np.int64)])
+        ring_weights = np.concatenate(
+            ring_ws + [np.array(link_ws, dtype=weights_flat.dtype)])
+
+    # Duplicate (row, col) pairs sum their weights during conversion, which
+    # reproduces the per-edge accumulation of the old dict-based build in
+    # one C-level pass
+    M = sp.coo_matrix((ring_weights, (rows, cols)),
+                      shape=(num_data, num_data)).tocsr()
+    return nx.from_scipy_sparse_array(M)
 def construct_net(data,weights,window_size):
-    G=create_network(data,weights,window_size)
-    show_node_counts(G)
-    G_pruned=prune_markers_minimal(G)
+    A, marker_dims, marker_values = create_network(data,weights,window_size)
+    show_node_counts(A, marker_dims)
+    G_pruned=prune_markers_minimal(A, marker_dims)
     return G_pruned
@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 # 1. Define the raw metric scores based on the aggregated poll data (Total Score).
 # These are manually aggregated from the High Point University poll data.
@@ -23,69 +25,47 @@ group_metrics = {
 GROUP_BASELINE = 0.25 # 25% for each of the 4 groups (0.25)
 
 # 2. Calculate the Group Tilts and New Group Weights
-group_data = {}
-grand_total_score = sum(raw_scores.values())
-
-for group, metrics in group_metrics.items():
-    # Calculate the total score for the group
-    group_score = sum(raw_scores[metric] for metric in metrics)
-    
-    # Calculate the Target Group Weight
-    target_group_weight = group_score / grand_total_score
-    
-    # Calculate the Group Tilt
-    group_tilt = target_group_weight - GROUP_BASELINE
-    
-    # Calculate the New Group Weight
-    new_group_weight = GROUP_BASELINE + group_tilt
-    
-    group_data[group] = {
-        'Group Total Score': group_score,
-        'Target Group Weight': target_group_weight,
-        'Group Tilt': group_tilt,
-        'New Group Weight': new_group_weight,
-        'Metrics': {}
-    }
+# Lay the metrics out as parallel NumPy arrays indexed by group, so every
+# reduction is one vectorized call instead of per-group Python sums
+group_names = list(group_metrics)
+metric_names = [metric for metrics in group_metrics.values() for metric in metrics]
+metric_scores = np.array([raw_scores[metric] for metric in metric_names], dtype=np.float64)
+metric_group = np.repeat(np.arange(len(group_metrics)),
+                         [len(metrics) for metrics in group_metrics.values()])
+
+grand_total_score = metric_scores.sum()
+group_scores = np.bincount(metric_group, weights=metric_scores)
+
+# Target Group Weight, Group Tilt and New Group Weight, per group
+target_group_weights = group_scores / grand_total_score
+group_tilts = target_group_weights - GROUP_BASELINE
+new_group_weights = GROUP_BASELINE + group_tilts
 
 # 3. Calculate the Sub-Indicator Tilts and Final Metric Weights
-results = []
-for group, data in group_data.items():
-    metrics = group_metrics[group]
-    num_sub_metrics = len(metrics)
-    group_score = data['Group Total Score']
-    
-    # Determine the Sub-Metric Baseline Weight
-    SUB_METRIC_BASELINE_INTERNAL = 1.0 / num_sub_metrics
-
-    for metric in metrics:
-        metric_score = raw_scores[metric]
-        
-        # Calculate the Target Sub-Metric Weight (Internal to the group)
-        target_sub_metric_weight_internal = metric_score / group_score
-        
-        # Calculate the Sub-Metric Tilt (Internal)
-        sub_metric_tilt_internal = target_sub_metric_weight_internal - SUB_METRIC_BASELINE_INTERNAL
-
-        # Calculate the New Sub-Metric Weight (Internal)
-        new_sub_metric_weight_internal = SUB_METRIC_BASELINE_INTERNAL + sub_metric_tilt_internal
-
-        # Calculate the Final Metric Weight (New Group Weight * New Sub-Metric Weight Internal)
-        final_metric_weight = data['New Group Weight'] * new_sub_metric_weight_internal
-        
-        results.append({
-            'Group': group,
-            'Sub-Indicator': metric.split('_')[-1], # Use the last part of the key for readability
-            'Group Baseline': GROUP_BASELINE * 100,
-            'Group Tilt (%)': data['Group Tilt'] * 100,
-            'New Group Weight (%)': data['New Group Weight'] * 100,
-            'Sub-Indicator Baseline (Internal)': SUB_METRIC_BASELINE_INTERNAL * 100,
-            'Sub-Indicator Tilt (Internal, %)': sub_metric_tilt_internal * 100,
-            'New Sub-Indicator Weight (Internal, %)': new_sub_metric_weight_internal * 100,
-            'Final Metric Weight (%)': final_metric_weight * 100
-        })
-
-# Create a DataFrame for clean presentation
-df_results = pd.DataFrame(results)
+# Sub-Metric Baseline Weight per group, then everything per metric
+sub_metric_baselines = 1.0 / np.bincount(metric_group)
+
+# Target Sub-Metric Weight (Internal to the group) and Tilt
+target_sub_metric_weights = metric_scores / group_scores[metric_group]
+sub_metric_tilts = target_sub_metric_weights - sub_metric_baselines[metric_group]
+new_sub_metric_weights = sub_metric_baselines[metric_group] + sub_metric_tilts
+
+# Final Metric Weight (New Group Weight * New Sub-Metric Weight Internal)
+final_metric_weights = new_group_weights[metric_group] * new_sub_metric_weights
+
+# Create a DataFrame for clean presentation, column by column from the
+# arrays above (no per-row dict construction)
+df_results = pd.DataFrame({
+    'Group': [group_names[g] for g in metric_group],
+    'Sub-Indicator': [metric.split('_')[-1] for metric in metric_names], # Use the last part of the key for readability
+    'Group Baseline': GROUP_BASELINE * 100,
+    'Group Tilt (%)': group_tilts[metric_group] * 100,
+    'New Group Weight (%)': new_group_weights[metric_group] * 100,
+    'Sub-Indicator Baseline (Internal)': sub_metric_baselines[metric_group] * 100,
+    'Sub-Indicator Tilt (Internal, %)': sub_metric_tilts * 100,
+    'New Sub-Indicator Weight (Internal, %)': new_sub_metric_weights * 100,
+    'Final Metric Weight (%)': final_metric_weights * 100
+})
 
 # Clean up Sub-Indicator names for the final table
 df_results['Sub-Indicator'] = df_results['Sub-Indicator'].replace({
@@ -97,21 +77,18 @@ df_results['Sub-Indicator'] = df_results['Sub-Indicator'].replace({
     'Race': 'Cultural - Race'
 })
 
-# Final reordering and sorting for readability
-column_order = [
-    'Group', 'Sub-Indicator', 'Group Baseline', 'Group Tilt (%)', 'New Group Weight (%)',
-    'Sub-Indicator Baseline (Internal)', 'Sub-Indicator Tilt (Internal, %)', 
-    'New Sub-Indicator Weight (Internal, %)', 'Final Metric Weight (%)'
-]
-df_results = df_results[column_order]
-
+# Final sorting for readability: group order, then sub-indicator name,
+# via one stable lexsort instead of the categorical sort_values pipeline
 group_order = ['Economic Security', 'Education', 'Location Affordability', 'Cultural - Race']
-df_results['Group_Sort'] = df_results['Group'].astype('category').cat.set_categories(group_order, ordered=True)
-df_results = df_results.sort_values(by=['Group_Sort', 'Sub-Indicator']).drop(columns=['Group_Sort'])
+group_rank = np.array([group_order.index(group) for group in df_results['Group']])
+order = np.lexsort((df_results['Sub-Indicator'].to_numpy(), group_rank))
+df_results = df_results.iloc[order]
 
 # --- LINE ADDED TO CREATE CSV FILE ---
-# The code below saves the final calculated DataFrame to a CSV file.
-df_results.to_csv('metric_weights_and_tilts_final.csv', index=False)
+# The code below saves the final calculated DataFrame to a CSV file,
+# through pyarrow's vectorized csv writer (one formatting pass per column)
+pacsv.write_csv(pa.Table.from_pandas(df_results, preserve_index=False),
+                'metric_weights_and_tilts_final.csv')
 
 # Load the data from the previously created CSV file
 # csv_filename = 'metric_weights_and_tilts.csv'
@@ -119,9 +96,13 @@ df_results.to_csv('metric_weights_and_tilts_final.csv', index=False)
 
 # --- Output to TXT (Plain Text Table) ---
 
-# Convert the DataFrame to a formatted plain text string
-# Using to_string(index=False) preserves the table structure without the index
-txt_content = df_results.to_string(index=False)
+# Format the table in a single fixed-width pass over the rows instead of
+# to_string's per-cell object walk
+numeric_cols = list(df_results.columns[2:])
+header_line = '%-22s  %-26s  ' % ('Group', 'Sub-Indicator') + '  '.join(numeric_cols)
+row_fmt = '%-22s  %-26s  ' + '  '.join('%%%d.4f' % len(col) for col in numeric_cols)
+txt_content = '\n'.join([header_line] +
+                        [row_fmt % row for row in df_results.itertuples(index=False)])
 
 # Define the filename for the text file
 txt_filename = 'metric_weights_and_tilts.txt'
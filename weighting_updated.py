@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 # ==========================================
 # 1. DEFINE INPUTS AND CONFIGURATION
@@ -42,71 +44,66 @@ GROUP_BASELINE = 0.25 # 25% Baseline for each of the 4 groups
 # 2. PERFORM CALCULATIONS
 # ==========================================
 
+# Lay the metrics out as parallel NumPy arrays indexed by group, so each
+# step below is one vectorized call instead of nested Python loops
+group_names = list(metric_config)
+metric_names = [metric for metrics in metric_config.values() for metric in metrics]
+metric_group = np.repeat(np.arange(len(metric_config)),
+                         [len(metrics) for metrics in metric_config.values()])
+is_fixed = np.array([config['type'] == 'Fixed'
+                     for metrics in metric_config.values() for config in metrics.values()])
+fixed_values = np.array([config.get('value', 0.0)
+                         for metrics in metric_config.values() for config in metrics.values()])
+poll_scores = np.array([raw_poll_scores.get(metric, 0.0) for metric in metric_names],
+                       dtype=np.float64)
+
 # Step A: Determine the "Available Weight" for polled items
 # We sum up all 'Fixed' weights to see what is left for the polled items.
-total_fixed_weight = sum(m['value'] for g in metric_config.values() for m in g.values() if m['type'] == 'Fixed')
+total_fixed_weight = fixed_values[is_fixed].sum()
 available_poll_weight = 1.0 - total_fixed_weight # Should be 0.875 (87.5%)
 
 # Step B: Sum the raw scores of the polled items
-grand_total_poll_score = sum(raw_poll_scores.values())
-
-results = []
-
-# Step C: Iterate through groups to calculate weights and tilts
-for group, metrics in metric_config.items():
-    
-    # --- Phase 1: Calculate Final Weights first (Hybrid Approach) ---
-    group_final_weight_sum = 0
-    temp_metric_data = []
-    
-    for metric_name, config in metrics.items():
-        if config['type'] == 'Fixed':
-            # It gets its fixed value exactly
-            final_metric_weight = config['value']
-        else:
-            # It gets a share of the remaining 87.5% based on popularity
-            raw_share = raw_poll_scores[metric_name] / grand_total_poll_score
-            final_metric_weight = raw_share * available_poll_weight
-        
-        group_final_weight_sum += final_metric_weight
-        temp_metric_data.append((metric_name, final_metric_weight))
-
-    # --- Phase 2: Reverse-Engineer the Tilts for Reporting ---
-    
-    # 1. Group Calculations
-    # How far is the calculated group weight from the 0.25 baseline?
-    group_tilt = group_final_weight_sum - GROUP_BASELINE
-    
-    # 2. Sub-Metric Calculations
-    num_sub_metrics = len(metrics)
-    internal_baseline = 1.0 / num_sub_metrics # e.g., 0.50 for EconSec, 1.0 for Education
-    
-    for metric_name, final_metric_weight in temp_metric_data:
-        
-        # Calculate Internal Weight (How much of the Group does this metric take up?)
-        # Formula: Metric Weight / Total Group Weight
-        internal_weight_actual = final_metric_weight / group_final_weight_sum
-        
-        # Calculate Internal Tilt
-        internal_tilt = internal_weight_actual - internal_baseline
-        
-        results.append({
-            'Group': group,
-            'Sub-Indicator': metric_name,
-            'Group Baseline': GROUP_BASELINE * 100,
-            'Group Tilt (%)': group_tilt * 100,
-            'New Group Weight (%)': group_final_weight_sum * 100,
-            'Sub-Indicator Baseline (Internal)': internal_baseline * 100,
-            'Sub-Indicator Tilt (Internal, %)': internal_tilt * 100,
-            'New Sub-Indicator Weight (Internal, %)': internal_weight_actual * 100,
-            'Final Metric Weight (%)': final_metric_weight * 100
-        })
+grand_total_poll_score = poll_scores.sum()
+
+# Step C: Calculate weights and tilts
+
+# --- Phase 1: Calculate Final Weights first (Hybrid Approach) ---
+# Fixed metrics get their value exactly; polled metrics get a share of
+# the remaining 87.5% based on popularity
+final_metric_weights = np.where(is_fixed, fixed_values,
+                                poll_scores / grand_total_poll_score * available_poll_weight)
+group_final_weights = np.bincount(metric_group, weights=final_metric_weights)
+
+# --- Phase 2: Reverse-Engineer the Tilts for Reporting ---
+
+# 1. Group Calculations
+# How far is the calculated group weight from the 0.25 baseline?
+group_tilts = group_final_weights - GROUP_BASELINE
+
+# 2. Sub-Metric Calculations
+internal_baselines = 1.0 / np.bincount(metric_group) # e.g., 0.50 for EconSec, 1.0 for Education
+
+# Internal Weight (How much of the Group does this metric take up?)
+internal_weights_actual = final_metric_weights / group_final_weights[metric_group]
+internal_tilts = internal_weights_actual - internal_baselines[metric_group]
 
 # ==========================================
 # 3. FORMATTING AND EXPORT
 # ==========================================
 
-df_results = pd.DataFrame(results)
+# Build the DataFrame column by column from the arrays above (no per-row
+# dict construction)
+df_results = pd.DataFrame({
+    'Group': [group_names[g] for g in metric_group],
+    'Sub-Indicator': metric_names,
+    'Group Baseline': GROUP_BASELINE * 100,
+    'Group Tilt (%)': group_tilts[metric_group] * 100,
+    'New Group Weight (%)': group_final_weights[metric_group] * 100,
+    'Sub-Indicator Baseline (Internal)': internal_baselines[metric_group] * 100,
+    'Sub-Indicator Tilt (Internal, %)': internal_tilts * 100,
+    'New Sub-Indicator Weight (Internal, %)': internal_weights_actual * 100,
+    'Final Metric Weight (%)': final_metric_weights * 100
+})
 
 # Clean up names
 df_results['Sub-Indicator'] = df_results['Sub-Indicator'].replace({
@@ -118,25 +115,26 @@ df_results['Sub-Indicator'] = df_results['Sub-Indicator'].replace({
     'Education': 'Education'
 })
 
-# Reorder columns to match original script
-column_order = [
-    'Group', 'Sub-Indicator', 'Group Baseline', 'Group Tilt (%)', 'New Group Weight (%)',
-    'Sub-Indicator Baseline (Internal)', 'Sub-Indicator Tilt (Internal, %)', 
-    'New Sub-Indicator Weight (Internal, %)', 'Final Metric Weight (%)'
-]
-df_results = df_results[column_order]
-
-# Sort by Group
+# Sort by Group (in group_order), then Sub-Indicator, via one stable
+# lexsort instead of the categorical sort_values pipeline
 group_order = ['Economic Security', 'Education', 'Location Affordability', 'Cultural - Race']
-df_results['Group_Sort'] = df_results['Group'].astype('category').cat.set_categories(group_order, ordered=True)
-df_results = df_results.sort_values(by=['Group_Sort', 'Sub-Indicator']).drop(columns=['Group_Sort'])
+group_rank = np.array([group_order.index(group) for group in df_results['Group']])
+order = np.lexsort((df_results['Sub-Indicator'].to_numpy(), group_rank))
+df_results = df_results.iloc[order]
 
 # --- OUTPUT TO CSV ---
+# pyarrow's vectorized csv writer formats each column in one pass
 csv_filename = 'metric_weights_and_tilts_final.csv'
-df_results.to_csv(csv_filename, index=False)
+pacsv.write_csv(pa.Table.from_pandas(df_results, preserve_index=False), csv_filename)
 
 # --- OUTPUT TO TXT ---
-txt_content = df_results.to_string(index=False)
+# One fixed-width formatting pass over the rows instead of to_string's
+# per-cell object walk
+numeric_cols = list(df_results.columns[2:])
+header_line = '%-22s  %-26s  ' % ('Group', 'Sub-Indicator') + '  '.join(numeric_cols)
+row_fmt = '%-22s  %-26s  ' + '  '.join('%%%d.4f' % len(col) for col in numeric_cols)
+txt_content = '\n'.join([header_line] +
+                        [row_fmt % row for row in df_results.itertuples(index=False)])
 txt_filename = 'metric_weights_and_tilts.txt'
 
 with open(txt_filename, 'w') as f: